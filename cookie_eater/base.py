@@ -7,47 +7,96 @@
 """
 Classes for managing Firefox and Chrome Cookies
 """
+from __future__ import division
 
 import os
 import sqlite3
 import datetime
 import sys
-
-from reusables import unique
+import time
+import threading
+from bisect import bisect_right
+from contextlib import contextmanager
+try:
+    from urllib.request import pathname2url
+except ImportError:
+    from urllib import pathname2url
 
 __all__ = ['CookieManager', 'BrowserException', 'InvalidSchema',
            'MissingCookiesDB']
 
 
-def _to_secs(td):
+# Hot path functions and methods take these helpers as underscored default
+# arguments, so they are looked up as locals rather than globals
+_UNIX_EPOCH = datetime.datetime(1970, 1, 1)
+_POWERS_OF_TEN = tuple(10 ** x for x in range(1, 40))
+_timestamp_lock = threading.Lock()
+_last_timestamps = {}
+
+if hasattr(time, "time_ns"):
+    def _micros_now():
+        """Current Unix time in whole microseconds"""
+        return time.time_ns() // 1000
+else:
+    def _micros_now():
+        """Current Unix time in whole microseconds"""
+        return int(time.time() * 10 ** 6)
+
+
+def _to_micros(td):
+    """
+    Exact integer microseconds of a timedelta
+
+    :return: int of microseconds
+    """
+    return (td.days * 86400 + td.seconds) * 10 ** 6 + td.microseconds
+
+
+def _digits(number):
     """
-    Compatibility for 2.6 and 3.2 for timedelta.total_seconds()
+    Count the decimal digits of a non negative integer without
+    converting it to a string.
 
-    :return: float of seconds
+    :return: int of digits
     """
-    if (sys.version_info[0:2] < (2, 7) or
-       (2, 7) < sys.version_info[0:2] < (3, 3)):
-        return ((td.microseconds + (td.seconds + td.days * 24 * 3600) * 10 **
-                6) / 10 ** 6)
-    else:
-        return td.total_seconds()
+    return bisect_right(_POWERS_OF_TEN, number) + 1
+
+
+def _fit_length(micros, length, _digits=_digits):
+    """
+    Scale a microsecond count to exactly length digits, the same as joining
+    the whole and fractional seconds and then truncating or zero padding.
+
+    :return: int with length digits
+    """
+    digits = _digits(micros)
+    if digits >= length:
+        return micros // 10 ** (digits - length)
+    return micros * 10 ** (length - digits)
+
+
+_platform = None
 
 
 def get_platform():
     """
     Provides the common name of the platform the code is currently running on.
+    The result is cached after the first lookup.
 
     :return: Platform name as str
     """
-    if "linux" in sys.platform:
-        return "linux"
-    elif "darwin" in sys.platform:
-        return "mac"
-    elif sys.platform in ("win32", "cygwin"):
-        return "windows"
-    else:
-        raise BrowserException("Unsupported Platform for"
-                               " automation profile gathering")
+    global _platform
+    if _platform is None:
+        if "linux" in sys.platform:
+            _platform = "linux"
+        elif "darwin" in sys.platform:
+            _platform = "mac"
+        elif sys.platform in ("win32", "cygwin"):
+            _platform = "windows"
+        else:
+            raise BrowserException("Unsupported Platform for"
+                                   " automation profile gathering")
+    return _platform
 
 
 class BrowserException(Exception):
@@ -62,7 +111,33 @@ class MissingCookiesDB(BrowserException):
     """Could not find the Cookie DB"""
 
 
-class CookieManager(object):
+class _CookieManagerMeta(type):
+    """
+    Prepares a manager class when it is created. Normalizes the valid
+    schema into frozensets, so verification is a set comparison, and builds
+    the insert and delete SQL from the table and column declarations, unless
+    the class spells them out itself.
+    """
+
+    def __init__(cls, name, bases, attrs):
+        super(_CookieManagerMeta, cls).__init__(name, bases, attrs)
+        if "_valid_structure" in attrs:
+            cls._valid_structure = {
+                "tables": frozenset(attrs["_valid_structure"]["tables"]),
+                "columns": frozenset(attrs["_valid_structure"]["columns"])}
+        if not getattr(cls, "table_name", ""):
+            return
+        if "_insert" not in attrs and cls._insert_columns:
+            cls._insert = "INSERT INTO {0} ({1}) VALUES ({2})".format(
+                cls.table_name, ", ".join(cls._insert_columns),
+                ", ".join("?" * len(cls._insert_columns)))
+        if "_delete" not in attrs and cls._search_columns["host"]:
+            cls._delete = "DELETE FROM {0} WHERE {1}=? AND {2}=?".format(
+                cls.table_name, cls._search_columns["host"],
+                cls._search_columns["name"])
+
+
+class CookieManager(_CookieManagerMeta("_CookieManagerBase", (object,), {})):
     """
     Parent class for all cookies managers for better cross browser
     compatibilities and portability.
@@ -73,18 +148,69 @@ class CookieManager(object):
         "window": "",
         "mac": "",
         "linux": ""}
+    _insert_columns = ()
     _insert = ""
+    _delete = ""
+    _search_columns = {"host": "",
+                       "name": "",
+                       "value": ""}
+    _auxiliary_indexes = (("host", "name"),)
+    _pragmas = ("PRAGMA journal_mode = WAL",
+                "PRAGMA synchronous = NORMAL",
+                "PRAGMA temp_store = MEMORY",
+                "PRAGMA cache_size = -20000")
     db = ""
     table_name = ""
-
-    def __init__(self, db=None):
+    _conn = None
+    _cur = None
+    _ro_conn = None
+    _ro_cur = None
+    _db_path_cache = {}
+    _col_index = {}
+    _open_dumps = 0
+
+    def __init__(self, db=None, auto_index=True):
+        # Guards the shared connections and cursors between threads
+        self._lock = threading.RLock()
         self.db = db if db else self.find_db()
+        self.auto_index = auto_index
         self.verify_schema()
 
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def __del__(self):
+        self.close()
+
+    def close(self):
+        """Close the cached database connections, if any are open."""
+        # __del__ may run on instances whose __init__ never set the lock
+        lock = getattr(self, "_lock", None)
+        if lock is None:
+            self._close_connections()
+        else:
+            with lock:
+                self._close_connections()
+
+    def _close_connections(self):
+        """Close both cached connections, the caller holds the lock."""
+        # Read only goes first, only a writable last connection can
+        # checkpoint and remove a WAL journal
+        if self._ro_conn is not None:
+            self._ro_conn.close()
+            self._ro_conn, self._ro_cur = None, None
+        if self._conn is not None:
+            self._conn.close()
+            self._conn, self._cur = None, None
+
     def _correct_tables_and_titles(self, cur):
         """
         Performs table and column name lookup and makes sure they match the
-        defined valid schema.
+        defined valid schema, in any order. Stores the position of each
+        column in _col_index for _row_to_dict.
 
         :param cur: SQLite cursor
         :type cur: sqlite3.Connection.cursor
@@ -93,36 +219,94 @@ class CookieManager(object):
         grab_ts = cur.execute("SELECT name FROM sqlite_master "
                               "WHERE type = 'table'")
         tables = grab_ts.fetchall()
-        grab_row = cur.execute("SELECT * FROM {0} LIMIT 1".format(
+        if frozenset(tables) != self._valid_structure["tables"]:
+            raise InvalidSchema("Tables expected {0} - Got {1}".format(
+                sorted(self._valid_structure["tables"]), tables))
+
+        grab_row = cur.execute("SELECT * FROM {0} LIMIT 0".format(
             self.table_name))
         cols = [description[0] for description in grab_row.description]
-
-        if tables != self._valid_structure["tables"]:
-            raise InvalidSchema("Tables expected {0} - Got {1}".format(
-                self._valid_structure["tables"], tables))
-        if cols != self._valid_structure["columns"]:
+        if frozenset(cols) != self._valid_structure["columns"]:
             raise InvalidSchema("Columns expected {0} - Got {1}".format(
-                self._valid_structure["columns"], cols))
+                sorted(self._valid_structure["columns"]), cols))
+        self._col_index = dict((col, index) for index, col in enumerate(cols))
 
     def verify_schema(self):
         """
         Match the selected DB to the class's valid schema to verify
         compatibility. Raises InvalidSchema on error.
+
+        If auto_index is set, also adds any missing auxiliary indexes,
+        without the writable connection's _pragmas, so the journal mode
+        is left as is.
         """
-        conn = sqlite3.Connection(self.db)
-        cur = conn.cursor()
-        try:
+        with self._lock:
+            conn, cur = self._connect_ro()
             self._correct_tables_and_titles(cur)
+            if self.auto_index:
+                self._add_auxiliary_indexes(cur)
+
+    def _indexed_columns(self, cur):
+        """
+        Look up the columns of every full (not partial) index on the table.
+
+        :param cur: SQLite cursor
+        :return: list of lists of column names, in index order
+        """
+        indexes = list()
+        for index in cur.execute("PRAGMA index_list({0})".format(
+                self.table_name)).fetchall():
+            if len(index) > 4 and index[4]:
+                continue
+            indexes.append([info[2] for info in cur.execute(
+                'PRAGMA index_info("{0}")'.format(index[1])).fetchall()])
+        return indexes
+
+    def _add_auxiliary_indexes(self, cur):
+        """
+        Create an index for each of the class's _auxiliary_indexes that no
+        existing index already leads with. The browser's own indexes are
+        never changed, this only ever adds a cookie_eater_ prefixed one.
+
+        :param cur: SQLite cursor
+        """
+        indexed = self._indexed_columns(cur)
+        missing = list()
+        for fields in self._auxiliary_indexes:
+            cols = [self._search_columns[field] for field in fields]
+            if not any(frozenset(index[:len(cols)]) == frozenset(cols)
+                       for index in indexed):
+                missing.append(cols)
+        if not missing:
+            return
+        # Only a speed up, so use a separate connection that gives up at
+        # once on a locked database, instead of waiting on it or failing
+        conn = sqlite3.connect(self.db, timeout=0, isolation_level=None)
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            for cols in missing:
+                conn.execute(
+                    "CREATE INDEX IF NOT EXISTS cookie_eater_{0}_{1} "
+                    "ON {0} ({2})".format(self.table_name, "_".join(cols),
+                                          ", ".join(cols)))
+            conn.execute("COMMIT")
+        except sqlite3.Error:
+            pass
         finally:
             conn.close()
 
     def find_db(self):
         """
         Look at the default profile path based on system platform to
-        find the browser's cookie database.
+        find the browser's cookie database. A found path is remembered
+        for the class, so the lookup only hits the filesystem once.
 
         :return: Path the cookie file in the default profile as str
         """
+        cookies_path = self._db_path_cache.get(self.__class__)
+        if cookies_path:
+            return cookies_path
+
         cookies_path = os.path.expanduser(self._db_paths[get_platform()])
 
         cookies_path = self._find_db_extra(cookies_path)
@@ -130,6 +314,7 @@ class CookieManager(object):
         if not os.path.exists(cookies_path):
             raise MissingCookiesDB("Cookie does not exist at "
                                    "{0}".format(cookies_path))
+        self._db_path_cache[self.__class__] = cookies_path
         return cookies_path
 
     @staticmethod
@@ -137,57 +322,191 @@ class CookieManager(object):
         """Some browser's profiles require path manipulation"""
         return expanded_path
 
-    @unique(wait=1, exception=BrowserException,
-            error_text="Could not generate unique timestamp")
-    def _current_time(self, epoch=datetime.datetime(1970, 1, 1), length=16):
+    def _current_time(self, epoch=_UNIX_EPOCH, length=16,
+                      _micros_now=_micros_now, _to_micros=_to_micros,
+                      _fit_length=_fit_length, _lock=_timestamp_lock,
+                      _last=_last_timestamps, _max=max):
         """
         Returns a string of the current time based on epoc date at a set
-         length of integers.
+         length of integers. Always larger than the last value returned
+         for the same epoch and length, as browsers use it as a unique key.
          """
-        delta_from_epic = (datetime.datetime.utcnow() - epoch)
-        return int(str(_to_secs(delta_from_epic)
-                       ).replace(".", "")[:length].ljust(length, "0"))
+        micros = _micros_now()
+        if epoch != _UNIX_EPOCH:
+            micros += _to_micros(_UNIX_EPOCH - epoch)
+        timestamp = _fit_length(micros, length)
+        with _lock:
+            timestamp = _max(timestamp, _last.get((epoch, length), 0) + 1)
+            _last[(epoch, length)] = timestamp
+        return timestamp
 
     @staticmethod
-    def _expire_time(epoch=datetime.datetime(1970, 1, 1), length=10,
-                     expires_in=datetime.timedelta(days=1)):
+    def _expire_time(epoch=_UNIX_EPOCH, length=10,
+                     expires_in=datetime.timedelta(days=1),
+                     _micros_now=_micros_now, _to_micros=_to_micros,
+                     _fit_length=_fit_length):
         """
         Returns a string of time based on epoch date at a set
          length of integers with an additional timedelta as specified.
          """
-        delta_from_epic = (datetime.datetime.utcnow() - epoch + expires_in)
-        return int(str(_to_secs(delta_from_epic)
-                       ).replace(".", "")[:length].ljust(length, "0"))
+        micros = _micros_now() + _to_micros(expires_in)
+        if epoch != _UNIX_EPOCH:
+            micros += _to_micros(_UNIX_EPOCH - epoch)
+        return _fit_length(micros, length)
 
     def _connect(self):
         """
         Overrideable SQL connection
-        function to return connection and cursor
+        function to return connection and cursor.
+
+        The connection and cursor are opened in autocommit mode on first use
+        and reused until close is called, writes manage their own
+        transactions. The statement cache is sized so the fixed browser
+        queries stay prepared between calls.
+
+        The class's _pragmas are applied once per connection, by default
+        switching to a write ahead log (which Firefox already uses) so each
+        commit costs one append instead of two synced journal writes.
         """
-        conn = sqlite3.Connection(self.db)
-        cur = conn.cursor()
-        return conn, cur
+        if self._conn is None:
+            conn = sqlite3.connect(self.db, isolation_level=None,
+                                   check_same_thread=False,
+                                   cached_statements=256)
+            try:
+                for pragma in self._pragmas:
+                    conn.execute(pragma).fetchall()
+            except Exception:
+                conn.close()
+                raise
+            self._conn, self._cur = conn, conn.cursor()
+        return self._conn, self._cur
 
-    def _insert_command(self, cursor, host, name, value, path,
-                        expires_at, secure, http_only, **kwargs):
-        """Child class must override"""
-        raise NotImplementedError()
+    def _connect_ro(self):
+        """
+        Overrideable read only SQL connection
+        function to return connection and cursor.
 
-    def _delete_command(self, cursor, host, name):
-        """Child class must override"""
-        raise NotImplementedError()
+        Opening read only avoids taking write locks or creating a journal,
+        so lookups do not contend with a running browser.
+        """
+        if self._ro_conn is None:
+            if sys.version_info[0:2] >= (3, 4):
+                self._ro_conn = sqlite3.connect(
+                    "file:{0}?mode=ro".format(
+                        pathname2url(os.path.abspath(self.db))),
+                    uri=True, isolation_level=None, check_same_thread=False,
+                    cached_statements=256)
+            else:
+                self._ro_conn = sqlite3.connect(self.db, isolation_level=None,
+                                                check_same_thread=False,
+                                                cached_statements=256)
+            self._ro_conn.execute("PRAGMA query_only = 1")
+            self._ro_cur = self._ro_conn.cursor()
+        return self._ro_conn, self._ro_cur
+
+    @contextmanager
+    def _transaction(self):
+        """
+        Provide a cursor inside a single immediate transaction, that is
+        committed if the block succeeds and rolled back if it raises.
+        Holds the instance lock, so threads take turns writing.
+        SQLite errors are raised as BrowserException, anything else as is.
+        """
+        with self._lock:
+            if self._open_dumps and self._ro_conn.execute(
+                    "PRAGMA journal_mode").fetchone()[0] != "wal":
+                raise BrowserException("Cannot write while an iter_dump "
+                                       "generator is unfinished, exhaust or "
+                                       "close it first")
+            try:
+                conn, cur = self._connect()
+                cur.execute("BEGIN IMMEDIATE")
+            except sqlite3.Error as err:
+                raise BrowserException("Could not lock database, "
+                                       "is browser open? - {0}".format(err))
+            try:
+                yield cur
+            except sqlite3.Error as err:
+                self._rollback(cur)
+                raise BrowserException(str(err))
+            except Exception:
+                self._rollback(cur)
+                raise
+            try:
+                cur.execute("COMMIT")
+            except sqlite3.Error as err:
+                self._rollback(cur)
+                raise BrowserException("Could not commit changes to database, "
+                                       "is browser open? - {0}".format(err))
+
+    @staticmethod
+    def _rollback(cur):
+        """Roll back the open transaction, unless SQLite already has"""
+        try:
+            cur.execute("ROLLBACK")
+        except sqlite3.OperationalError:
+            pass
 
-    def _limited_select_command(self, cursor):
+    def _insert_values(self, host, name, value, path, expires_in, secure,
+                       http_only, **kwargs):
         """Child class must override"""
         raise NotImplementedError()
 
+    def _cookie_values(self, cookie):
+        """
+        Turn a dictionary of add_cookie keyword arguments into the row
+        of values for the insert statement, applying add_cookie's defaults.
+        """
+        kwargs = dict(cookie)
+        return self._insert_values(
+            kwargs.pop("host"), kwargs.pop("name"), kwargs.pop("value"),
+            path=kwargs.pop("path", "/"),
+            expires_in=kwargs.pop("expires_in", datetime.timedelta(days=1)),
+            secure=kwargs.pop("secure", 0),
+            http_only=kwargs.pop("http_only", 0), **kwargs)
+
+    def _insert_command(self, cursor, host, name, value, path,
+                        expires_in, secure, http_only, **kwargs):
+        """SQL insert command with the row built by _insert_values"""
+        return cursor.execute(self._insert, self._insert_values(
+            host, name, value, path, expires_in, secure, http_only, **kwargs))
+
+    def _insert_many_command(self, cursor, rows):
+        """Insert rows built by _insert_values with one prepared statement"""
+        return cursor.executemany(self._insert, rows)
+
+    def _delete_many_command(self, cursor, rows):
+        """Delete (host, name) rows with one prepared statement"""
+        return cursor.executemany(self._delete, rows)
+
+    def _delete_command(self, cursor, host, name):
+        """SQL delete command for an exact host and name"""
+        return cursor.execute(self._delete, (host, name))
+
     def _match_command(self, cursor, match, value):
         """Child class must override"""
         raise NotImplementedError()
 
+    def _search_command(self, cursor, host, name, value):
+        """
+        Select full rows where any of the provided terms appear in the
+        matching column from _search_columns, ignoring case.
+        """
+        clauses, params = list(), list()
+        for field, term in (("host", host), ("name", name), ("value", value)):
+            if term:
+                clauses.append("{0} LIKE ? ESCAPE '\\'".format(
+                    self._search_columns[field]))
+                params.append("%{0}%".format(
+                    term.replace("\\", "\\\\").replace(
+                        "%", "\\%").replace("_", "\\_")))
+        return cursor.execute("SELECT * FROM {0} WHERE {1}".format(
+            self.table_name, " OR ".join(clauses)), params)
+
     def _row_to_dict(self, row):
         """
-        Child class must override.
+        Child class must override, self._col_index maps column names
+        to their position in the row.
 
         The dictionary must contain:
         - host
@@ -196,10 +515,13 @@ class CookieManager(object):
         """
         raise NotImplementedError()
 
-    def _int_time_to_float(self, int_time, period_placement=10):
+    def _int_time_to_float(self, int_time, period_placement=10,
+                           _digits=_digits, _abs=abs, _float=float):
         """Turn integer based time from DBs into regular float time"""
-        return float("{0}.{1}".format(str(int_time)[:period_placement],
-                                      str(int_time)[period_placement:]))
+        digits = _digits(_abs(int_time))
+        if digits <= period_placement:
+            return _float(int_time)
+        return int_time / 10 ** (digits - period_placement)
 
     def add_cookie(self, host, name, value, path="/",
                    expires_in=datetime.timedelta(days=1), secure=0,
@@ -217,20 +539,9 @@ class CookieManager(object):
         :param secure: 0 or 1 for to use on secured connections only
         :param http_only: 0 or 1 Use on http only
         """
-        conn, cur = self._connect()
-        try:
+        with self._transaction() as cur:
             self._insert_command(cur, host, name, value, path, expires_in,
                                  secure, http_only, **kwargs)
-        except Exception as err:
-            raise BrowserException(str(err))
-        else:
-            try:
-                conn.commit()
-            except Exception as err:
-                raise BrowserException("Could not commit changes to database, "
-                                       "is browser open? - {0}".format(err))
-        finally:
-            conn.close()
 
     def delete_cookie(self, host, name):
         """
@@ -239,19 +550,8 @@ class CookieManager(object):
         :param host: URL of cookie, must be exact
         :param name: The name of the cookie, such as "SESSIONID"
         """
-        conn, cur = self._connect()
-        try:
+        with self._transaction() as cur:
             self._delete_command(cur, host, name)
-        except Exception as err:
-            raise BrowserException(str(err))
-        else:
-            try:
-                conn.commit()
-            except Exception as err:
-                raise BrowserException("Could not commit changes to database, "
-                                       "is browser open? - {0}".format(err))
-        finally:
-            conn.close()
 
     def update_cookie(self, host, name, value, path="/",
                       expires_in=datetime.timedelta(days=1),
@@ -269,33 +569,56 @@ class CookieManager(object):
         :param ignore_missing: Boolean, if set to False it will raise an
         exception if there is not a cookie to remove before updating
         """
-        conn, cur = self._connect()
-
-        try:
-            self._delete_command(cur, host, name)
-        except Exception as err:
-            if not ignore_missing:
-                raise BrowserException(str(err))
+        with self._transaction() as cur:
+            try:
+                self._delete_command(cur, host, name)
+            except sqlite3.Error as err:
+                if not ignore_missing:
+                    raise BrowserException(str(err))
 
-        try:
             self._insert_command(cur, host, name, value, path, expires_in,
                                  secure, http_only, **kwargs)
-        except Exception as err:
-            raise BrowserException(str(err))
-        else:
-            try:
-                conn.commit()
-            except Exception as err:
-                raise BrowserException("Could not commit changes to database, "
-                                       "is browser open? - {0}".format(err))
-        finally:
-            conn.close()
+
+    def add_cookies(self, cookies):
+        """
+        Add multiple cookies to the database in a single transaction.
+
+        :param cookies: iterable of dictionaries of add_cookie keyword
+        arguments, "host", "name" and "value" are required
+        """
+        with self._transaction() as cur:
+            self._insert_many_command(
+                cur, [self._cookie_values(cookie) for cookie in cookies])
+
+    def delete_cookies(self, cookies):
+        """
+        Remove multiple cookies from the database in a single transaction.
+
+        :param cookies: iterable of (host, name) pairs, hosts must be exact
+        """
+        with self._transaction() as cur:
+            self._delete_many_command(cur, [(host, name)
+                                            for host, name in cookies])
+
+    def update_cookies(self, cookies):
+        """
+        Delete and re-add multiple cookies in a single transaction.
+
+        :param cookies: iterable of dictionaries of update_cookie keyword
+        arguments, "host", "name" and "value" are required
+        """
+        cookies = list(cookies)
+        with self._transaction() as cur:
+            self._delete_many_command(cur, [(cookie["host"], cookie["name"])
+                                            for cookie in cookies])
+            self._insert_many_command(
+                cur, [self._cookie_values(cookie) for cookie in cookies])
 
     def find_cookies(self, host="", name="", value=""):
         """
         Search for cookies based of the host, name or cookie contents.
-        All values are loose, and will be compared by converting to lowercase
-        and check if they exist "in" the field specified.
+        All values are loose, and will be compared ignoring (ASCII) case
+        to check if they exist "in" the field specified.
 
         :param host: Cookie URL to search
         :param name: The name of the cookie
@@ -304,37 +627,39 @@ class CookieManager(object):
         """
         if not host and not name and not value:
             raise BrowserException("Please specify something to search by")
-        conn, cur = self._connect()
+        with self._lock:
+            conn, cur = self._connect_ro()
+            try:
+                rows = self._search_command(cur, host, name, value)
+            except sqlite3.Error as err:
+                raise BrowserException(str(err))
+            return list(map(self._row_to_dict, rows))
 
-        try:
-            rows = self._limited_select_command(cur)
-        except Exception as err:
-            conn.close()
-            raise BrowserException(str(err))
-
-        result_ids, results = list(), list()
-
-        for row in rows:
-            match = False
-            if host and host.lower() in row[1].lower():
-                match = True
-            if name and name.lower() in row[2].lower():
-                match = True
-            if value and value.lower() in row[3].lower():
-                match = True
-            if match:
-                result_ids.append(row[0])
-
-        for result in result_ids:
+    def iter_dump(self):
+        """
+        Iterate over the database one row at a time, without holding every
+        cookie in memory.
+
+        Until the generator is exhausted or closed it holds a read lock,
+        which on a database not in WAL mode blocks every writer, so this
+        manager refuses to write in the meantime.
+
+        :return: generator of every row from the Cookies database,
+        as dictionaries
+        """
+        with self._lock:
+            conn, cur = self._connect_ro()
             try:
-                row = self._match_command(cur, "rowid", result)
-            except Exception as err:
-                conn.close()
+                rows = self._match_command(conn.cursor(), 1, 1)
+            except sqlite3.Error as err:
                 raise BrowserException(str(err))
-            else:
-                results.append(self._row_to_dict(row.fetchone()))
-        conn.close()
-        return results
+            self._open_dumps += 1
+        try:
+            for row in rows:
+                yield self._row_to_dict(row)
+        finally:
+            with self._lock:
+                self._open_dumps -= 1
 
     def dump(self):
         """
@@ -342,13 +667,4 @@ class CookieManager(object):
 
         :return: list of every row from the Cookies database, as dictionaries
         """
-        conn, cur = self._connect()
-
-        try:
-            rows = self._match_command(cur, 1, 1)
-        except Exception as err:
-            raise BrowserException(str(err))
-        else:
-            return [self._row_to_dict(row) for row in rows]
-        finally:
-            conn.close()
+        return list(self.iter_dump())
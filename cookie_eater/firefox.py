@@ -28,10 +28,13 @@ class FirefoxCookiesV1(CookieManager):
                                     'lastAccessed', 'creationTime', 'isSecure',
                                     'isHttpOnly', 'appId', 'inBrowserElement']}
 
-    _insert = ("INSERT INTO moz_cookies (baseDomain, originAttributes,"
-               " name, value, host, path, expiry, lastAccessed, "
-               "creationTime, isSecure, isHttpOnly, appId, inBrowserElement"
-               ") VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)")
+    _insert_columns = ('baseDomain', 'originAttributes', 'name', 'value',
+                       'host', 'path', 'expiry', 'lastAccessed',
+                       'creationTime', 'isSecure', 'isHttpOnly', 'appId',
+                       'inBrowserElement')
+    _search_columns = {"host": "host",
+                       "name": "name",
+                       "value": "value"}
 
     _db_paths = {
         "windows": "~\\AppData\\Roaming\\Mozilla\\Firefox\\Profiles\\",
@@ -50,30 +53,18 @@ class FirefoxCookiesV1(CookieManager):
                                    "{0}".format(expanded_path))
         return os.path.join(expanded_path, default[0], "cookies.sqlite")
 
-    def _insert_command(self, cursor, host, name, value, path,
-                        expires_in, secure, http_only, **kwargs):
-        """Firefox specific SQL insert command with required times"""
+    def _insert_values(self, host, name, value, path,
+                       expires_in, secure, http_only, **kwargs):
+        """Firefox specific SQL insert values with required times"""
         now = self._current_time(length=16)
         exp = self._expire_time(length=10, expires_in=expires_in)
         base_domain = str(kwargs.get("base_domain", ".".join(host.split(".")
                           [-2 if not host.endswith(".co.uk") else -3:])))
 
-        return cursor.execute(self._insert, (base_domain,
-                              str(kwargs.get('origin_attributes', "")),
-                              name, value, host, path, exp, now, now,
-                              secure, http_only,
-                              int(kwargs.get('app_id', 0)),
-                              int(bool(kwargs.get('in_browser_element', 0)))))
-
-    def _delete_command(self, cursor, host, name):
-        """Firefox specific SQL delete command"""
-        return cursor.execute("DELETE FROM moz_cookies WHERE host=? AND name=?",
-                              (host, name))
-
-    def _limited_select_command(self, cursor):
-        """Firefox specific SQL select command"""
-        return cursor.execute("SELECT rowid, host, name, value FROM "
-                              "moz_cookies")
+        return (base_domain, str(kwargs.get('origin_attributes', "")),
+                name, value, host, path, exp, now, now, secure, http_only,
+                int(kwargs.get('app_id', 0)),
+                int(bool(kwargs.get('in_browser_element', 0))))
 
     def _match_command(self, cursor, match, value):
         """Firefox specific SQL select command with matching"""
@@ -82,9 +73,11 @@ class FirefoxCookiesV1(CookieManager):
 
     def _row_to_dict(self, row):
         """Returns a SQL query row as a standard dictionary."""
-        return {"host": row[5], "name": row[3], "value": row[4],
-                "created": self._int_time_to_float(row[9]),
-                "expires": self._int_time_to_float(row[7])}
+        index = self._col_index
+        return {"host": row[index["host"]], "name": row[index["name"]],
+                "value": row[index["value"]],
+                "created": self._int_time_to_float(row[index["creationTime"]]),
+                "expires": self._int_time_to_float(row[index["expiry"]])}
 
 
 class FirefoxCookies(FirefoxCookiesV1):
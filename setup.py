@@ -23,9 +23,7 @@ setup(
     url='https://github.com/cdgriffith/CookieEater',
     license='MIT',
     author=attrs['author'],
-    tests_require=["pytest", "coverage >= 3.6", "tox",  "pytest-cov",
-                   "reusables"],
-    install_requires=["reusables"],
+    tests_require=["pytest", "coverage >= 3.6", "tox",  "pytest-cov"],
     author_email='chris@cdgriffith.com',
     description='Browser Cookie Management',
     long_description=long_description,
@@ -54,7 +52,6 @@ setup(
         'Topic :: Documentation :: Sphinx',
         ],
     extras_require={
-        'testing': ["pytest", "coverage >= 3.6", "tox",  "pytest-cov",
-                    "reusables"],
+        'testing': ["pytest", "coverage >= 3.6", "tox",  "pytest-cov"],
         },
 )
@@ -6,6 +6,7 @@ import datetime
 import sqlite3
 import os
 import shutil
+import threading
 
 import unittest
 
@@ -50,6 +51,8 @@ class TestBrowser(unittest.TestCase):
         assert len(str(t2)) == 5
         t3 = tb._current_time(length=10)
         assert time.time() - float(t3) <= 3
+        times = [tb._current_time() for _ in range(100)]
+        assert times == sorted(set(times))
 
     def test_exp_time(self):
         tb = ExampleBrowser()
@@ -64,37 +67,31 @@ class TestBrowser(unittest.TestCase):
     def test_overrides(self):
         tb = ExampleBrowser()
         try:
-            tb._insert_command(None, None, None, None, None, None, None, None)
+            tb._insert_values(None, None, None, None, None, None, None)
         except NotImplementedError:
             assert True
         else:
             assert False
 
         try:
-            tb._delete_command(None, None, None)
+            tb._row_to_dict(None)
         except NotImplementedError:
             assert True
         else:
             assert False
 
         try:
-            tb._limited_select_command(None)
+            tb._match_command(None, None, None)
         except NotImplementedError:
             assert True
         else:
             assert False
 
+    def test_invalid_schema(self):
         try:
-            tb._row_to_dict(None)
-        except NotImplementedError:
-            assert True
-        else:
-            assert False
-
-        try:
-            tb._match_command(None, None, None)
-        except NotImplementedError:
-            assert True
+            FirefoxCookies(db=chrome_db)
+        except InvalidSchema as err:
+            assert "Tables expected" in str(err)
         else:
             assert False
 
@@ -154,6 +151,97 @@ class TestBrowser(unittest.TestCase):
         res = cur.fetchall()
         assert len(res) == 0
 
+    def test_firefox_batch_cookies(self):
+        fox = FirefoxCookiesV1(db=fox_db)
+        fox.add_cookies([{"host": "www.example.com", "name": "test_name",
+                          "value": "test_value"},
+                         {"host": "www.example.com", "name": "test_name2",
+                          "value": "test_value2", "path": "/test"}])
+        fox.update_cookies([{"host": "www.example.com", "name": "test_name",
+                             "value": "test_value3"}])
+        conn = sqlite3.Connection(fox_db)
+        cur = conn.cursor()
+        cur.execute("SELECT * FROM {0} ORDER BY name".format(fox.table_name))
+        res = cur.fetchall()
+        try:
+            assert len(res) == 2
+            assert res[0][3] == "test_name"
+            assert res[0][4] == "test_value3"
+            assert res[1][3] == "test_name2"
+            assert res[1][6] == "/test"
+        finally:
+            conn.close()
+
+        fox.delete_cookies([("www.example.com", "test_name"),
+                            ("www.example.com", "test_name2")])
+        conn = sqlite3.Connection(fox_db)
+        cur = conn.cursor()
+        cur.execute("SELECT * FROM {0}".format(fox.table_name))
+        res = cur.fetchall()
+        try:
+            assert len(res) == 0
+        finally:
+            conn.close()
+
+    def test_firefox_add_cookie_errors(self):
+        fox = FirefoxCookies(db=fox_db)
+        fox.add_cookie("www.example.com", "test_name", "test_value")
+        try:
+            fox.add_cookie("www.example.com", "test_name", "test_value")
+        except BrowserException as err:
+            assert "UNIQUE" in str(err)
+        else:
+            assert False
+        try:
+            fox.add_cookie("www.example.com", "test_name2", "test_value",
+                           app_id="not a number")
+        except ValueError:
+            assert True
+        else:
+            assert False
+        fox.add_cookie("www.example.com", "test_name3", "test_value")
+        assert len(fox.dump()) == 2
+
+    def test_firefox_context_manager(self):
+        with FirefoxCookies(db=fox_db) as fox:
+            fox.add_cookie("www.example.com", "test_name", "test_value")
+            conn = fox._conn
+            fox.delete_cookie("www.example.com", "test_name2")
+            assert fox._conn is conn
+        assert fox._conn is None
+
+    def test_firefox_threaded_writes(self):
+        fox = FirefoxCookies(db=fox_db)
+        errors = []
+
+        def add(thread):
+            try:
+                for index in range(20):
+                    fox.add_cookie("www.example.com",
+                                   "test_{0}_{1}".format(thread, index),
+                                   "test_value")
+            except Exception as err:
+                errors.append(err)
+
+        threads = [threading.Thread(target=add, args=(x,)) for x in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        assert not errors
+        assert len(fox.dump()) == 80
+
+    def test_firefox_close_waits_for_transaction(self):
+        fox = FirefoxCookies(db=fox_db)
+        closer = threading.Thread(target=fox.close)
+        with fox._transaction() as cur:
+            closer.start()
+            closer.join(0.2)
+            assert closer.is_alive()
+            cur.execute("SELECT 1")
+        closer.join()
+        assert fox._conn is None
+
     def test_firefox_find_db(self):
         from cookie_eater.base import get_platform
         try:
@@ -193,6 +281,8 @@ class TestBrowser(unittest.TestCase):
         res3 = a.find_cookies(value="value")
         assert len(res3) == 1
         assert res3[0]["host"] == "example.com"
+        assert a.find_cookies(name="%") == []
+        assert len(a.find_cookies(host="missing", name="test_")) == 1
 
     def test_chrome_add_cookies(self):
         chrome = ChromeCookies(db=chrome_db)
@@ -210,6 +300,86 @@ class TestBrowser(unittest.TestCase):
         finally:
             conn.close()
 
+    def test_chrome_add_cookie_locked(self):
+        chrome = ChromeCookies(db=chrome_db, auto_index=False)
+        conn = sqlite3.Connection(chrome_db, isolation_level=None)
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            chrome.add_cookie("www.example.com", "test_name", "test_value")
+        except BrowserException as err:
+            assert "Could not lock database" in str(err)
+        else:
+            assert False
+        finally:
+            conn.close()
+
+    def test_chrome_auxiliary_index(self):
+        def indexes():
+            conn = sqlite3.Connection(chrome_db)
+            try:
+                return [row[0] for row in conn.execute(
+                    "SELECT name FROM sqlite_master WHERE type = 'index'")]
+            finally:
+                conn.close()
+
+        ChromeCookies(db=chrome_db, auto_index=False).close()
+        assert "cookie_eater_cookies_host_key_name" not in indexes()
+        ChromeCookies(db=chrome_db).close()
+        assert "cookie_eater_cookies_host_key_name" in indexes()
+        conn = sqlite3.Connection(chrome_db)
+        try:
+            mode = conn.execute("PRAGMA journal_mode").fetchone()[0]
+            assert mode == "delete"
+        finally:
+            conn.close()
+
+    def test_chrome_auxiliary_index_locked(self):
+        conn = sqlite3.Connection(chrome_db, isolation_level=None)
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            chrome = ChromeCookies(db=chrome_db)
+            assert chrome._conn is None
+        finally:
+            conn.close()
+        chrome.add_cookie("www.example.com", "test_name", "test_value")
+        assert len(chrome.dump()) == 1
+
+    def test_chrome_auxiliary_index_locked_wal(self):
+        conn = sqlite3.Connection(chrome_db, isolation_level=None)
+        conn.execute("PRAGMA journal_mode = WAL")
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            start = time.time()
+            chrome = ChromeCookies(db=chrome_db)
+            assert time.time() - start < 1
+            assert chrome._conn is None
+        finally:
+            conn.close()
+        chrome.close()
+
+    def test_chrome_add_cookie_existing_rows(self):
+        ChromeCookies(db=chrome_db).add_cookie("www.example.com", "test_name",
+                                               "test_value")
+        chrome = ChromeCookies(db=chrome_db)
+        chrome.add_cookie("www.example.com", "test_name2", "test_value")
+        assert len(chrome.dump()) == 2
+
+    def test_chrome_add_cookies_batch(self):
+        chrome = ChromeCookies(db=chrome_db)
+        chrome.add_cookies({"host": "www.example.com", "name": name,
+                            "value": "test_value"}
+                           for name in ("test_name", "test_name2"))
+        conn = sqlite3.Connection(chrome_db)
+        cur = conn.cursor()
+        cur.execute("SELECT * FROM {0}".format(chrome.table_name))
+        res = cur.fetchall()
+        try:
+            assert len(res) == 2
+            assert res[0][2] == "test_name"
+            assert res[1][2] == "test_name2"
+        finally:
+            conn.close()
+
     def test_chrome_find_cookies(self):
         a = ChromeCookies(db=chrome_db)
         a.add_cookie("example.com", "test_name", "test_value")
@@ -230,6 +400,10 @@ class TestBrowser(unittest.TestCase):
         dump = a.dump()
         assert len(dump) == 2
         assert dump[0]["host"] == "example.com"
+        rows = a.iter_dump()
+        assert next(rows)["name"] == "test_name"
+        assert len(a.find_cookies(name="test_name")) == 2
+        assert [row["name"] for row in rows] == ["test_name2"]
 
     def test_chrome_dump(self):
         a = ChromeCookies(db=chrome_db)
@@ -239,6 +413,30 @@ class TestBrowser(unittest.TestCase):
         assert len(dump) == 2
         assert dump[0]["host"] == "example.com"
 
+    def test_chrome_write_during_dump(self):
+        a = ChromeCookies(db=chrome_db, auto_index=False)
+        a.add_cookies({"host": "example.com", "name": name, "value": "test"}
+                      for name in ("test_name", "test_name2"))
+        a.close()
+        conn = sqlite3.Connection(chrome_db)
+        conn.execute("PRAGMA journal_mode = DELETE")
+        conn.close()
+
+        a = ChromeCookies(db=chrome_db, auto_index=False)
+        rows = a.iter_dump()
+        next(rows)
+        start = time.time()
+        try:
+            a.add_cookie("example.com", "test_name3", "test_value")
+        except BrowserException as err:
+            assert "iter_dump" in str(err)
+        else:
+            assert False
+        assert time.time() - start < 1
+        rows.close()
+        a.add_cookie("example.com", "test_name3", "test_value")
+        assert len(a.dump()) == 3
+
     def test_chrome_delete(self):
         a = ChromeCookies(db=chrome_db)
         a.add_cookie("example.com", "test_name3", "test_value")